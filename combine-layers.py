@@ -1,12 +1,14 @@
 import argparse
 import random
 import time
+from concurrent.futures import ThreadPoolExecutor
 from os import listdir
 from os.path import abspath, join
 from typing import Dict, Tuple
 
 from skimage.io import imsave
 
+from webbster.cache import LayerCache
 from webbster.layers import WebbsterLayer, screen_blend_multiple
 
 
@@ -96,6 +98,20 @@ if __name__ == "__main__":
             "as COLORS_FILE)"
         ),
     )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help=(
+            "decode every layer image instead of using the cache of decoded "
+            "layers (stored in INPUT_FOLDER/.webbster_cache)"
+        ),
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=4096,
+        help="maximum size of the cache of decoded layers in MB (default is 4096)",
+    )
 
     # Get values of arguments
     args = parser.parse_args()
@@ -103,6 +119,8 @@ if __name__ == "__main__":
     output_filepath = args.OUTPUT_IMAGE
     colors_filepath = args.COLORS_FILE
     export_colors_filepath = args.export_colors_file
+    use_cache = not args.no_cache
+    cache_size = args.cache_size
 
     start_time = time.time()
 
@@ -123,13 +141,26 @@ if __name__ == "__main__":
     if colors_filepath:
         print(f'Importing colors file at "{colors_filepath}".')
         custom_colors = parse_colors_file(colors_filepath)
-    layers = []
-    for image_filepath in image_filepaths:
+
+    # Decoded layers are cached so that repeat runs (e.g. when only the colors
+    # file has changed) can memory-map them instead of decoding them again.
+    cache = (
+        LayerCache(join(layers_folder, ".webbster_cache"), cache_size * 1_000_000)
+        if use_cache
+        else None
+    )
+
+    def load_layer(image_filepath: str) -> WebbsterLayer:
+        hsv = (None, None, None)
         if colors_filepath and abspath(image_filepath).upper() in custom_colors:
             hsv = custom_colors[abspath(image_filepath).upper()]
-            layers.append(WebbsterLayer.fromImageFile(image_filepath, *hsv))
-        else:
-            layers.append(WebbsterLayer.fromImageFile(image_filepath))
+        return WebbsterLayer.fromImageFile(image_filepath, *hsv, cache=cache)
+
+    # Layers are loaded in parallel, keeping the same order as the files
+    with ThreadPoolExecutor() as executor:
+        layers = list(executor.map(load_layer, image_filepaths))
+    if cache:
+        cache.evict()
 
     print(f"Colorizing layers.")
     colors_used = []
@@ -6,8 +6,8 @@ from os.path import join
 
 from skimage.io import imsave
 
-from webbster.fits import WebbsterFITS
-from webbster.layers import WebbsterLayer, screen_blend_multiple
+from webbster.catalog import WebbsterCatalog
+from webbster.pipeline import WebbsterPipeline
 
 # Suppresses FITSFixedWarning from Astropy/WCSLIB, since JWST images set it off
 # TODO: Only ignore that specific class of warning
@@ -40,6 +40,33 @@ if __name__ == "__main__":
         default="png",
         help="when exporting layers, use .jpg extension instead of .png (may be faster and/or save storage)",
     )
+    parser.add_argument(
+        "-c",
+        "--coadd",
+        action="store_true",
+        help="combine images with the same filter into a single layer",
+    )
+    parser.add_argument(
+        "--coadd_method",
+        choices=["mean", "median"],
+        default="mean",
+        help="how to combine overlapping images when co-adding (default is mean)",
+    )
+    parser.add_argument(
+        "--index",
+        help=(
+            "path to a SQLite file in which to index the FITS headers, so that "
+            "repeat runs only rescan new or changed files"
+        ),
+    )
+    parser.add_argument(
+        "--target",
+        help="only use FITS files whose target name matches TARGET",
+    )
+    parser.add_argument(
+        "--program",
+        help="only use FITS files from the given JWST program ID (e.g. 2731)",
+    )
 
     # Get values of arguments
     args = parser.parse_args()
@@ -47,53 +74,53 @@ if __name__ == "__main__":
     output_filepath = args.OUTPUT_IMAGE
     layers_folder = args.LAYERS_FOLDER
     layers_extension = args.jpg_layers
+    coadd = args.coadd
+    coadd_method = args.coadd_method
+    index_filepath = args.index
+    target = args.target
+    program = args.program
 
     start_time = time.time()
 
-    # Gets fits files from directory and initialize fitsFilter objects for each
-    print(f"Loading images from fits.")
-    filters = [
-        WebbsterFITS(join(fits_folder, filename))
-        for filename in listdir(fits_folder)
-        if filename[-5:].lower() == ".fits"
-    ]
-
-    # Find image with greatest resolution to use as reference for aligning other
-    # images. Also, rename filters if there are duplicate filter names.
-    max_res = 0
-    ref_filter = filters[0]
-    names = {}
-    for filter in filters:
-        print(f" > Checking resolution of {filter.name}.")
-        if filter.res > max_res:
-            max_res = filter.res
-            ref_filter = filter
-
-        if filter.name in names:
-            names[filter.name] += 1
-            filter.name = filter.name + "-" + str(names[filter.name])
-        else:
-            names[filter.name] = 1
-
-    print(f" > Reference filter is {ref_filter.name}.")
-
-    # Process and export each layer
-    for filter in filters:
-        print(f"Processing {filter.name}.")
-        print(f" > Adjusting contrast of {filter.name}.")
-        filter.adjust_contrast()
-        if filter != ref_filter:
-            print(f" > Reprojecting {filter.name}.")
-            filter.reproject(ref_filter)
-        if layers_folder:
-            print(f" > Saving layer image for {filter.name}.")
-            filter.save_image(layers_folder, extension=layers_extension)
-
-    # Convert WebbsterFITS to WebbsterLayer
-    layers = [WebbsterLayer.fromFITS(filter) for filter in filters]
+    # Gets fits files from directory. If an index is used or a selection is
+    # requested, the headers are indexed first so that we only open the data of
+    # the files that will actually be used.
+    if index_filepath or target or program:
+        print(f"Indexing fits headers.")
+        catalog = WebbsterCatalog(index_filepath or ":memory:")
+        print(f" > Indexed {catalog.scan(fits_folder)} new or changed file(s).")
+        for filepath, reason in catalog.skipped:
+            print(f" > Skipping {filepath} ({reason}).")
+        entries = catalog.select(folder=fits_folder, target=target, program=program)
+        if not entries:
+            parser.error("no fits files match the given target and program")
+
+        # Only keep the files that overlap the one with the greatest resolution
+        max_entry = max(entries, key=lambda entry: entry.res)
+        overlapping = {entry.filepath for entry in catalog.overlapping(max_entry)}
+        catalog.close()
+        for entry in entries:
+            if entry.filepath not in overlapping:
+                print(f" > Skipping {entry.fits_filename} (no overlap).")
+        fits_filepaths = [
+            entry.filepath for entry in entries if entry.filepath in overlapping
+        ]
+    else:
+        fits_filepaths = [
+            join(fits_folder, filename)
+            for filename in listdir(fits_folder)
+            if filename[-5:].lower() == ".fits"
+        ]
+
+    pipeline = WebbsterPipeline.fromFITS(
+        fits_filepaths, coadd, coadd_method, verbose=True
+    )
+    if layers_folder:
+        print(f"Saving layer images.")
+        pipeline.save_layers(layers_folder, extension=layers_extension)
 
     print(f"Colorizing layers.")
-    for layer in layers:
+    for layer in pipeline.layers:
         print(
             (
                 f" > Colorizing {layer.name} with HSV ({round(layer.hue * 360)}, "
@@ -103,7 +130,7 @@ if __name__ == "__main__":
         layer.colorize()
 
     print(f"Blending layers.")
-    blended_image = screen_blend_multiple([layer.color_image for layer in layers])
+    blended_image = pipeline.blend()
 
     print(f'Saving composited image to "{output_filepath}".')
     imsave(
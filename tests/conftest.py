@@ -0,0 +1,52 @@
+from os.path import join
+
+import numpy as np
+import pytest
+from astropy.io import fits
+from astropy.wcs import WCS
+
+
+@pytest.fixture
+def make_fits(tmp_path):
+    """Returns a function that writes a small JWST-like FITS file to `tmp_path`
+    and returns its filepath.
+
+    The image is filled with `value` (or random values if `value` is `None`).
+    Its WCS is a simple tangent projection, where `crpix` is the (x, y) pixel
+    (1-based) at `crval` (RA, Dec), so images with the same `crval` and a
+    different `crpix` are shifted by whole pixels."""
+
+    rng = np.random.default_rng(0)
+
+    def make(
+        name: str,
+        fits_filename: str = "jw02731-o001_t017_nircam_clear-f090w_i2d.fits",
+        shape: tuple = (20, 30),
+        value: float = None,
+        crpix: tuple = (1, 1),
+        crval: tuple = (159.2, -58.6),
+        program: str = "02731",
+    ) -> str:
+        wcs = WCS(naxis=2)
+        wcs.wcs.ctype = ["RA---TAN", "DEC--TAN"]
+        wcs.wcs.crval = crval
+        wcs.wcs.crpix = crpix
+        wcs.wcs.cdelt = [-1e-5, 1e-5]
+
+        primary = fits.PrimaryHDU()
+        primary.header["FILENAME"] = fits_filename
+        primary.header["PROGRAM"] = program
+        primary.header["INSTRUME"] = fits_filename.split("_")[2].upper()
+        primary.header["TARGPROP"] = "NGC3324"
+        data = (
+            rng.random(shape, dtype=np.float32)
+            if value is None
+            else np.full(shape, value, dtype=np.float32)
+        )
+        sci = fits.ImageHDU(data, header=wcs.to_header(), name="SCI")
+
+        filepath = join(tmp_path, f"{name}.fits")
+        fits.HDUList([primary, sci]).writeto(filepath)
+        return filepath
+
+    return make
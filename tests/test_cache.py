@@ -0,0 +1,49 @@
+from os import listdir
+from os.path import join
+
+import numpy as np
+from skimage.io import imsave
+
+from webbster.cache import LayerCache
+
+
+def make_layer_file(folder) -> str:
+    image_file = join(folder, "JW02731_NIRCAM-F090W.png")
+    imsave(image_file, np.arange(64 * 48, dtype=np.uint8).reshape((64, 48)))
+    return image_file
+
+
+def test_load_uses_cached_array(tmp_path):
+    image_file = make_layer_file(tmp_path)
+    cache = LayerCache(join(tmp_path, "cache"))
+
+    decoded = cache.load(image_file)
+    cached = cache.load(image_file)
+    assert isinstance(cached, np.memmap)
+    assert np.array_equal(decoded, cached)
+
+
+def test_load_without_writable_cache(tmp_path):
+    image_file = make_layer_file(tmp_path)
+    # A file in place of the cache folder makes every write fail
+    blocked_folder = join(tmp_path, "cache")
+    open(blocked_folder, "w").close()
+    cache = LayerCache(blocked_folder)
+
+    image = cache.load(image_file)
+    assert image.shape == (64, 48)
+    # No temporary file is left behind
+    assert sorted(listdir(tmp_path)) == ["JW02731_NIRCAM-F090W.png", "cache"]
+    cache.evict()
+
+
+def test_evict_applies_lowered_limit_to_cached_arrays(tmp_path):
+    image_file = make_layer_file(tmp_path)
+    cache_folder = join(tmp_path, "cache")
+    LayerCache(cache_folder).load(image_file)
+
+    # Only cache hits on this run, but the new limit still applies
+    cache = LayerCache(cache_folder, max_bytes=0)
+    cache.load(image_file)
+    cache.evict()
+    assert listdir(cache_folder) == []
@@ -0,0 +1,84 @@
+from os import remove
+from os.path import basename, join
+
+import numpy as np
+from astropy.io import fits
+
+from webbster.catalog import WebbsterCatalog
+
+
+def test_select_by_program_ignores_leading_zeros(tmp_path, make_fits):
+    make_fits("a", program="02731")
+    make_fits("b", program="01234")
+    catalog = WebbsterCatalog()
+    catalog.scan(tmp_path)
+
+    for program in ("2731", "02731", 2731):
+        entries = catalog.select(program=program)
+        assert [entry.program for entry in entries] == ["02731"]
+    assert catalog.select(program="273") == []
+
+
+def test_scan_skips_files_that_are_not_images(tmp_path, make_fits):
+    image_filepath = make_fits("image")
+    primary = fits.PrimaryHDU()
+    primary.header["FILENAME"] = "jw02731-o001_t017_nircam_clear-f090w_x1d.fits"
+    fits.HDUList([primary]).writeto(join(tmp_path, "primary_only.fits"))
+    table = fits.BinTableHDU.from_columns(
+        [fits.Column(name="FLUX", format="D", array=np.zeros(1000))]
+    )
+    fits.HDUList([primary, table]).writeto(join(tmp_path, "table_x1d.fits"))
+    with open(join(tmp_path, "not_fits.fits"), "w") as f:
+        f.write("not a fits file")
+
+    catalog = WebbsterCatalog()
+    assert catalog.scan(tmp_path) == 1
+    assert [entry.filepath for entry in catalog.select()] == [image_filepath]
+    assert sorted(filepath for filepath, _ in catalog.skipped) == [
+        join(tmp_path, "not_fits.fits"),
+        join(tmp_path, "primary_only.fits"),
+        join(tmp_path, "table_x1d.fits"),
+    ]
+
+    # Unchanged files, including skipped ones, are not read again
+    assert catalog.scan(tmp_path) == 0
+    assert catalog.skipped == []
+
+
+def test_rescan_updates_index(tmp_path, make_fits):
+    index_filepath = join(tmp_path, "catalog.db")
+    a = make_fits("a")
+    b = make_fits("b")
+
+    catalog = WebbsterCatalog(index_filepath)
+    assert catalog.scan(tmp_path) == 2
+    catalog.close()
+
+    # Unchanged files are not read again by a later run
+    catalog = WebbsterCatalog(index_filepath)
+    assert catalog.scan(tmp_path) == 0
+
+    # Removed files are dropped from the index
+    remove(a)
+    assert catalog.scan(tmp_path) == 0
+    assert [entry.filepath for entry in catalog.select()] == [b]
+
+
+def test_footprints_overlap_across_ra_zero(tmp_path, make_fits):
+    # Centered on RA = 0, so its footprint crosses from 359.99... to 0.00...
+    make_fits("wrap", crval=(0, 0), crpix=(15, 10))
+    # Just east of RA = 0, overlapping the east edge of the first image
+    make_fits("east", crval=(0.0001, 0), crpix=(30, 10))
+    make_fits("far", crval=(180, 0), crpix=(15, 10))
+    catalog = WebbsterCatalog()
+    catalog.scan(tmp_path)
+    entries = {basename(entry.filepath): entry for entry in catalog.select()}
+    wrap, east, far = (entries[f"{name}.fits"] for name in ("wrap", "east", "far"))
+
+    assert wrap.ra_min < 360 < wrap.ra_max
+    assert east.ra_max < 1
+    assert wrap.overlaps(east) and east.overlaps(wrap)
+    assert not wrap.overlaps(far) and not far.overlaps(east)
+    assert sorted(entry.filepath for entry in catalog.overlapping(east)) == sorted(
+        [wrap.filepath, east.filepath]
+    )
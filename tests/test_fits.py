@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from webbster.fits import WebbsterFITS
+
+
+def make_overlapping_fits(make_fits):
+    """Returns three constant images on a 20x30 grid. The first (1) covers
+    every column, the second (3) covers columns 10-29, and the third (5) covers
+    columns 20-29."""
+
+    return [
+        WebbsterFITS(make_fits("a", shape=(20, 30), value=1)),
+        WebbsterFITS(make_fits("b", shape=(20, 20), value=3, crpix=(-9, 1))),
+        WebbsterFITS(make_fits("c", shape=(20, 10), value=5, crpix=(-19, 1))),
+    ]
+
+
+@pytest.mark.parametrize(
+    "method, expected", [("mean", (1, 2, 3)), ("median", (1, 2, 3))]
+)
+@pytest.mark.parametrize("max_pixels", [50_000_000, 60])
+def test_coadd(make_fits, method, expected, max_pixels):
+    a, b, c = make_overlapping_fits(make_fits)
+    a.coadd([b, c], a, method, max_pixels=max_pixels)
+
+    assert a.data.shape == (20, 30)
+    # Columns next to the edges of the smaller images are left out, since
+    # interpolation there depends on how the edge is handled
+    assert np.allclose(a.data[:, 0:9], expected[0])
+    assert np.allclose(a.data[:, 11:19], expected[1])
+    assert np.allclose(a.data[:, 21:30], expected[2])
+
+
+def test_coadd_takes_reference_header(make_fits):
+    a, b, c = make_overlapping_fits(make_fits)
+    b.coadd([c], a)
+
+    assert b.hdu is a.hdu
+    assert (b.naxis1, b.naxis2, b.res) == (30, 20, 600)
+    # Pixels not covered by any image are set to 0
+    assert np.allclose(b.data[:, 0:9], 0)
+    assert np.allclose(b.data[:, 21:30], 4)
+
+
+def test_coadd_rejects_unknown_method(make_fits):
+    a, b, c = make_overlapping_fits(make_fits)
+    with pytest.raises(ValueError):
+        a.coadd([b, c], a, "sum")
@@ -0,0 +1,94 @@
+import json
+import subprocess
+import sys
+from multiprocessing import resource_tracker
+from os.path import dirname
+
+import numpy as np
+
+from webbster.layers import WebbsterLayer
+from webbster.pipeline import WebbsterPipeline
+
+REPO_FOLDER = dirname(dirname(__file__))
+
+# Attaches to the shared layers, blends them, and exits
+ATTACH_SCRIPT = """
+import json, sys
+from webbster.pipeline import WebbsterPipeline
+
+descriptors = json.loads(sys.stdin.read())
+pipeline = WebbsterPipeline.fromSharedMemory(descriptors)
+pipeline.set_color(descriptors[0]["name"], hue=0.5)
+print(int(pipeline.blend().sum()))
+pipeline.close()
+"""
+
+
+def make_pipeline() -> WebbsterPipeline:
+    rng = np.random.default_rng(0)
+    layers = [
+        WebbsterLayer(rng.integers(0, 256, (64, 48), dtype=np.uint8), name, hue, 0.8, 1)
+        for name, hue in (("NIRCAM-F090W", 0.6), ("NIRCAM-F444W", 0.0))
+    ]
+    return WebbsterPipeline(layers)
+
+
+def run_attach_process(descriptors) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", ATTACH_SCRIPT],
+        input=json.dumps(descriptors),
+        capture_output=True,
+        text=True,
+        cwd=REPO_FOLDER,
+        check=True,
+    )
+
+
+def test_shared_layers_survive_attaching_process():
+    pipeline = make_pipeline()
+    descriptors = pipeline.share()
+
+    expected = make_pipeline()
+    expected.set_color("NIRCAM-F090W", hue=0.5)
+    expected_sum = int(expected.blend().sum())
+
+    # Each process attaches, exits, and must leave the shared memory in place
+    for _ in range(2):
+        result = run_attach_process(descriptors)
+        assert int(result.stdout) == expected_sum
+        assert "leaked" not in result.stderr
+
+    # The owner can still use and free the shared memory
+    assert np.array_equal(
+        pipeline.get_layer("NIRCAM-F444W").gray_image,
+        expected.get_layer("NIRCAM-F444W").gray_image,
+    )
+    pipeline.close()
+
+
+def test_close_tolerates_unlinked_shared_memory():
+    pipeline = make_pipeline()
+    descriptors = pipeline.share()
+    attached = WebbsterPipeline.fromSharedMemory(descriptors)
+    attached.close()
+    # Unlink the shared memory behind the owner's back
+    for shm in pipeline.shared_memory:
+        resource_tracker.register(shm._name, "shared_memory")
+        shm.unlink()
+    pipeline.close()
+
+
+def test_coadd_only_combines_recognized_filters(make_fits):
+    fits_filepaths = [
+        make_fits("prism", "jw01234-o001_t001_nirspec_clear-prism_i2d.fits"),
+        make_fits("f090w", "jw02731-o001_t017_nircam_clear-f090w_i2d.fits"),
+        make_fits("f999x", "jw01234-o001_t001_niriss_clear-f999x_i2d.fits"),
+        make_fits("f090w_2", "jw02731-o002_t017_nircam_clear-f090w_i2d.fits"),
+    ]
+
+    pipeline = WebbsterPipeline.fromFITS(fits_filepaths, coadd=True)
+    assert sorted(layer.name for layer in pipeline.layers) == [
+        "NIRCAM-F090W",
+        "NONE",
+        "NONE-2",
+    ]
@@ -0,0 +1,96 @@
+from contextlib import suppress
+from hashlib import sha1
+from os import getpid, listdir, makedirs, remove, replace, stat, utime
+from os.path import abspath, join
+from threading import get_ident
+from typing import Any
+
+import numpy as np
+from skimage.io import imread
+
+
+class LayerCache:
+    """Keeps decoded layer images as `.npy` files in a cache folder, so that
+    later runs can memory-map them instead of decoding the images again."""
+
+    def __init__(self, folder: str, max_bytes: int = 4_000_000_000):
+        """
+        Uses `folder` (created when needed) to store the cached arrays. Once the
+        cache grows larger than `max_bytes`, the least recently used arrays are
+        removed.
+        """
+
+        self.folder = folder
+        self.max_bytes = max_bytes
+
+    def get_cache_filepath(self, image_file: str) -> str:
+        """
+        Returns the path of the cached array for `image_file`. The name is
+        based on the absolute path, size, and modification time of the image,
+        so a changed image will not match its old cached array.
+        """
+
+        image_stat = stat(image_file)
+        key = f"{abspath(image_file)}|{image_stat.st_size}|{image_stat.st_mtime_ns}"
+        return join(self.folder, sha1(key.encode()).hexdigest() + ".npy")
+
+    def load(self, image_file: str) -> Any:
+        """
+        Returns the image data of `image_file`, memory-mapped (read-only) from
+        the cache if possible. Otherwise, decodes the image, adds it to the
+        cache, and returns the decoded data. If the cache can't be written to
+        (e.g. read-only folder or full disk), the image is simply not cached.
+
+        This does not enforce `max_bytes`, so call `evict()` after loading.
+        """
+
+        cache_filepath = self.get_cache_filepath(image_file)
+        try:
+            image = np.load(cache_filepath, mmap_mode="r")
+        except (OSError, ValueError):
+            pass
+        else:
+            # Mark as recently used
+            with suppress(OSError):
+                utime(cache_filepath)
+            return image
+
+        image = imread(image_file)
+        # Write to a temporary file first so that other threads or processes
+        # never see a partially written array
+        temp_filepath = f"{cache_filepath}.{getpid()}-{get_ident()}.tmp"
+        try:
+            makedirs(self.folder, exist_ok=True)
+            with open(temp_filepath, "wb") as f:
+                np.save(f, image)
+            replace(temp_filepath, cache_filepath)
+        except OSError:
+            with suppress(OSError):
+                remove(temp_filepath)
+        return image
+
+    def evict(self):
+        """Removes the least recently used arrays until the cache is no larger
+        than `max_bytes`."""
+
+        try:
+            filenames = listdir(self.folder)
+        except OSError:
+            return
+
+        cached = []
+        for filename in filenames:
+            if filename.endswith(".npy"):
+                with suppress(OSError):
+                    filepath = join(self.folder, filename)
+                    file_stat = stat(filepath)
+                    cached.append((file_stat.st_mtime, file_stat.st_size, filepath))
+
+        total_bytes = sum(size for _, size, _ in cached)
+        for _, size, filepath in sorted(cached):
+            if total_bytes <= self.max_bytes:
+                break
+            # Another thread or process may have removed it already
+            with suppress(OSError):
+                remove(filepath)
+            total_bytes -= size
@@ -0,0 +1,280 @@
+import sqlite3
+from dataclasses import astuple, dataclass, fields
+from os import stat, walk
+from os.path import abspath, join, sep
+from typing import List
+
+import numpy as np
+from astropy.io import fits
+from astropy.wcs import WCS
+
+from .fits import get_filter_from_filename
+
+
+@dataclass()
+class CatalogEntry:
+    """Stores the header information of a single FITS file in the catalog,
+    including the bounding box of its WCS footprint in degrees."""
+
+    filepath: str
+    size: int
+    mtime: float
+    fits_filename: str
+    program: str
+    instrument: str
+    target: str
+    filter: str
+    naxis1: int
+    naxis2: int
+    ra_min: float
+    ra_max: float
+    dec_min: float
+    dec_max: float
+
+    @property
+    def res(self) -> int:
+        """Returns the resolution of the image in pixels."""
+        return self.naxis1 * self.naxis2
+
+    def overlaps(self, other: "CatalogEntry") -> bool:
+        """Returns `True` if the footprint of this entry overlaps the footprint
+        of `other`."""
+        if self.dec_min > other.dec_max or other.dec_min > self.dec_max:
+            return False
+        # Right ascension wraps around at 360 degrees, so we also check with the
+        # other footprint shifted by a full turn in either direction
+        return any(
+            self.ra_min <= other.ra_max + shift and other.ra_min + shift <= self.ra_max
+            for shift in (0, 360, -360)
+        )
+
+
+class WebbsterCatalog:
+    """Keeps a local SQLite index of FITS headers so that input files can be
+    selected and matched by footprint without opening their data."""
+
+    COLUMNS = [field.name for field in fields(CatalogEntry)]
+
+    def __init__(self, index_filepath: str = ":memory:"):
+        """
+        Opens (or creates) the SQLite index at `index_filepath`. By default, the
+        index is only kept in memory.
+        """
+
+        self.index_filepath = index_filepath
+        self.connection = sqlite3.connect(index_filepath)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS fits_files (
+                filepath TEXT PRIMARY KEY,
+                size INTEGER, mtime REAL, fits_filename TEXT, program TEXT,
+                instrument TEXT, target TEXT, filter TEXT, naxis1 INTEGER,
+                naxis2 INTEGER, ra_min REAL, ra_max REAL, dec_min REAL,
+                dec_max REAL
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS fits_files_target ON fits_files (target)"
+        )
+        # Files that can't be used as images are remembered so that rescans
+        # don't have to open them again unless they change
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS skipped_files (
+                filepath TEXT PRIMARY KEY, size INTEGER, mtime REAL, reason TEXT
+            )"""
+        )
+        self.connection.commit()
+        self.skipped = []
+
+    def scan(self, folder: str) -> int:
+        """
+        Recursively scans `folder` for FITS files and indexes their headers.
+
+        Files whose size and modification time match the index are skipped, and
+        files that no longer exist are removed from the index. Files that can't
+        be read or aren't 2-D images with a celestial WCS (see
+        `read_header_entry()`) are left out of the index, and the ones found
+        during this scan are listed in `skipped` as (filepath, reason) tuples.
+        Returns the number of files that were (re)indexed.
+        """
+
+        indexed = {
+            entry.filepath: (entry.size, entry.mtime)
+            for entry in self.select(folder=folder)
+        }
+        prefix = abspath(folder) + sep
+        indexed.update(
+            (filepath, (size, mtime))
+            for filepath, size, mtime in self.connection.execute(
+                "SELECT filepath, size, mtime FROM skipped_files "
+                "WHERE substr(filepath, 1, ?) = ?",
+                [len(prefix), prefix],
+            )
+        )
+
+        new_entries = []
+        skipped_rows = []
+        self.skipped = []
+        for dirpath, _, filenames in walk(folder):
+            for filename in filenames:
+                if filename[-5:].lower() != ".fits":
+                    continue
+                filepath = abspath(join(dirpath, filename))
+                try:
+                    file_stat = stat(filepath)
+                except OSError as e:
+                    self.skipped.append((filepath, str(e)))
+                    continue
+                if indexed.pop(filepath, None) == (
+                    file_stat.st_size,
+                    file_stat.st_mtime,
+                ):
+                    continue
+                try:
+                    new_entries.append(
+                        read_header_entry(
+                            filepath, file_stat.st_size, file_stat.st_mtime
+                        )
+                    )
+                except Exception as e:
+                    self.skipped.append((filepath, str(e)))
+                    skipped_rows.append(
+                        (filepath, file_stat.st_size, file_stat.st_mtime, str(e))
+                    )
+
+        # Clear every file that was removed or (re)read from both tables before
+        # inserting the new rows
+        for table in ("fits_files", "skipped_files"):
+            self.connection.executemany(
+                f"DELETE FROM {table} WHERE filepath = ?",
+                [(filepath,) for filepath in indexed]
+                + [(entry.filepath,) for entry in new_entries]
+                + [(row[0],) for row in skipped_rows],
+            )
+        self.connection.executemany(
+            f"INSERT INTO fits_files VALUES "
+            f"({', '.join('?' * len(self.COLUMNS))})",
+            [astuple(entry) for entry in new_entries],
+        )
+        self.connection.executemany(
+            "INSERT INTO skipped_files VALUES (?, ?, ?, ?)", skipped_rows
+        )
+        self.connection.commit()
+        return len(new_entries)
+
+    def select(
+        self,
+        folder: str = None,
+        program: str = None,
+        instrument: str = None,
+        target: str = None,
+        filter: str = None,
+    ) -> List[CatalogEntry]:
+        """
+        Returns the indexed entries matching every criterion that is provided.
+
+        `folder` limits the results to files inside that folder, while
+        `program`, `instrument`, `target`, and `filter` (e.g. `NIRCAM-F090W`)
+        are compared case-insensitively against the header values. Leading
+        zeros are ignored for `program`, so `2731` matches the `02731` written
+        by JWST.
+        """
+
+        conditions = []
+        params = []
+        if folder:
+            prefix = abspath(folder) + sep
+            conditions.append("substr(filepath, 1, ?) = ?")
+            params += [len(prefix), prefix]
+        if program is not None:
+            conditions.append("ltrim(program, '0') = ltrim(?, '0')")
+            params.append(str(program).strip())
+        for column, value in (
+            ("instrument", instrument),
+            ("target", target),
+            ("filter", filter),
+        ):
+            if value is not None:
+                conditions.append(f"upper({column}) = upper(?)")
+                params.append(str(value))
+
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM fits_files"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY filepath"
+        return [CatalogEntry(*row) for row in self.connection.execute(query, params)]
+
+    def overlapping(self, entry: CatalogEntry) -> List[CatalogEntry]:
+        """Returns the indexed entries whose footprint overlaps that of
+        `entry` (including `entry` itself, if indexed)."""
+
+        ra_conditions = " OR ".join(
+            f"(ra_min <= ? + {shift} AND ra_max >= ? + {shift})"
+            for shift in (0, 360, -360)
+        )
+        rows = self.connection.execute(
+            f"SELECT {', '.join(self.COLUMNS)} FROM fits_files "
+            f"WHERE dec_min <= ? AND dec_max >= ? AND ({ra_conditions}) "
+            f"ORDER BY filepath",
+            [entry.dec_max, entry.dec_min] + [entry.ra_max, entry.ra_min] * 3,
+        )
+        return [CatalogEntry(*row) for row in rows]
+
+    def close(self):
+        """Closes the connection to the index."""
+        self.connection.close()
+
+
+def read_header_entry(filepath: str, size: int, mtime: float) -> CatalogEntry:
+    """
+    Creates a CatalogEntry from the headers of the FITS file at `filepath`,
+    without reading any image data.
+
+    Raises `ValueError` if the file is not usable by WebbsterFITS, meaning that
+    the primary header has no `FILENAME`, or extension 1 is not a 2-D image
+    with a celestial WCS (e.g. spectra and other table products).
+    """
+
+    # HDUs are loaded lazily, so only the two headers we access are read
+    with fits.open(filepath) as hdul:
+        primary_header = hdul[0].header
+        try:
+            sci_hdu = hdul[1]
+        except IndexError:
+            raise ValueError("no extension after the primary HDU")
+        if not isinstance(sci_hdu, fits.ImageHDU) or sci_hdu.header["NAXIS"] != 2:
+            raise ValueError("extension 1 is not a 2-D image")
+        sci_header = sci_hdu.header
+        if not WCS(sci_header).has_celestial:
+            raise ValueError("extension 1 has no celestial WCS")
+        if "FILENAME" not in primary_header:
+            raise ValueError("primary header has no FILENAME")
+
+        fits_filename = primary_header["FILENAME"].upper()
+        filter = get_filter_from_filename(fits_filename)
+        naxis1 = sci_header["NAXIS1"]
+        naxis2 = sci_header["NAXIS2"]
+
+        # Corners of the image in (RA, Dec). If the footprint crosses RA = 0,
+        # shift the low side up so that the bounding box stays contiguous.
+        footprint = WCS(sci_header).calc_footprint(axes=(naxis1, naxis2))
+        ra = footprint[:, 0] % 360
+        if ra.max() - ra.min() > 180:
+            ra = np.where(ra < 180, ra + 360, ra)
+
+        return CatalogEntry(
+            filepath,
+            size,
+            mtime,
+            fits_filename,
+            str(primary_header.get("PROGRAM", "")).strip(),
+            str(primary_header.get("INSTRUME", "")).upper(),
+            str(primary_header.get("TARGPROP", primary_header.get("TARGNAME", ""))),
+            filter.get_filter_name() if filter else "NONE",
+            naxis1,
+            naxis2,
+            float(ra.min()),
+            float(ra.max()),
+            float(footprint[:, 1].min()),
+            float(footprint[:, 1].max()),
+        )
+
@@ -1,4 +1,5 @@
 from os.path import join
+from typing import List
 
 import numpy as np
 from astropy.io import fits
@@ -34,34 +35,10 @@ class WebbsterFITS:
     def get_filter(self) -> WebbFilter:
         """
         Gets filter by searching for an instance of a filter name in fits
-        filename. If there are multiple instances, prefers the one that is on
-        the pupil wheel, or appears last.
-
-        If no instance of a filter name is found, returns `None`.
+        filename (see `get_filter_from_filename()`).
         """
 
-        # Get instrument and filter names from fits filename
-        try:
-            name_parts = self.fits_filename.split("_")
-            instrument = name_parts[2]
-            filters = name_parts[3].split("-")
-        except:
-            return None
-
-        # Get dictionary of filters for the specific instrument
-        if instrument not in WebbFilters.FILTERS:
-            return None
-        instrument_filters = WebbFilters.FILTERS[instrument].dict
-
-        # Find appropriate filter
-        fits_filter = None
-        for filter in reversed(filters):
-            if filter in instrument_filters and (
-                fits_filter is None or instrument_filters[filter].is_pupil
-            ):
-                fits_filter = instrument_filters[filter]
-
-        return fits_filter
+        return get_filter_from_filename(self.fits_filename)
 
     def adjust_contrast(self):
         """
@@ -114,6 +91,95 @@ class WebbsterFITS:
         # Full data
         self.data = proj_data
 
+    def coadd(
+        self,
+        others: List["WebbsterFITS"],
+        ref_fits: "WebbsterFITS",
+        method: str = "mean",
+        max_pixels: int = 50_000_000,
+    ):
+        """
+        Reprojects this image and each image in `others` (usually exposures
+        taken with the same filter) to be aligned with `ref_fits`, then combines
+        them into this image, which from then on shares the WCS of `ref_fits`.
+
+        Where images overlap, `method` determines how they are combined: either
+        `"mean"`, which is weighted by how much of each output pixel is covered
+        by an input image, or `"median"`. Pixels not covered by any image are
+        set to 0. This should be done before adjusting the contrast, since it
+        operates on the raw data.
+
+        Like `reproject()`, this is done in slices, where `max_pixels` is the
+        maximum number of pixels allowed in a slice. For the mean, the images
+        are added to running totals one at a time, so a slice uses about as much
+        memory as in `reproject()`. The median needs every image at once, so
+        each slice is made smaller by a factor of the number of images.
+        """
+
+        if method not in ("mean", "median"):
+            raise ValueError('Co-add method must be either "mean" or "median".')
+
+        inputs = [self] + list(others)
+        start_row = 0
+        max_rows = max_pixels // ref_fits.naxis1
+        if method == "median":
+            max_rows //= len(inputs)
+        max_rows = max(1, max_rows)
+        coadd_data = np.zeros((ref_fits.naxis2, ref_fits.naxis1), dtype=np.float32)
+        while start_row < ref_fits.naxis2:
+            end_row = min(start_row + max_rows, ref_fits.naxis2)
+            ref_wcs = WCS(ref_fits.hdu.header)
+            ref_wcs = ref_wcs[start_row:end_row, 0 : ref_fits.naxis1]
+            slice_shape = (end_row - start_row, ref_fits.naxis1)
+            if method == "median":
+                stack = np.empty((len(inputs),) + slice_shape, dtype=np.float32)
+            else:
+                weighted_sum = np.zeros(slice_shape)
+                weight_sum = np.zeros(slice_shape)
+            # Reproject each input onto this slice. The footprint tells us how
+            # much of each output pixel the input covers, and is used as its
+            # weight.
+            for i, input_fits in enumerate(inputs):
+                proj_slice, footprint = reproject_interp(
+                    (input_fits.data, input_fits.hdu.header),
+                    ref_wcs,
+                    shape_out=slice_shape,
+                )
+                footprint[~np.isfinite(proj_slice)] = 0
+                if method == "median":
+                    stack[i] = np.where(footprint > 0, proj_slice, np.nan)
+                else:
+                    np.nan_to_num(proj_slice, copy=False)
+                    proj_slice *= footprint
+                    weighted_sum += proj_slice
+                    weight_sum += footprint
+                del proj_slice, footprint
+
+            if method == "median":
+                combined = np.nanmedian(stack, axis=0)
+                del stack
+            else:
+                weight_sum[weight_sum == 0] = 1
+                combined = weighted_sum / weight_sum
+                del weighted_sum, weight_sum
+            coadd_data[start_row:end_row] = np.nan_to_num(combined)
+            start_row = end_row
+
+        self.data = coadd_data
+        self.hdu = ref_fits.hdu
+        self.naxis1 = ref_fits.naxis1
+        self.naxis2 = ref_fits.naxis2
+        self.res = ref_fits.res
+
+    def get_image_name(self) -> str:
+        """
+        Returns the name (without extension) used for the layer image of this
+        file, in the format `PROGRAM_INSTRUMENT-FILTER` (e.g.
+        `JW02731_NIRCAM-F090W`).
+        """
+
+        return f"{self.fits_filename.split('-')[0]}_{self.name}"
+
     def save_image(
         self, folder: str = None, filename: str = None, extension: str = "png"
     ) -> str:
@@ -130,10 +196,39 @@ class WebbsterFITS:
         self.png_data = img_as_ubyte(self.data)
         self.png_data = np.flipud(self.png_data)
         if folder:
-            filepath = join(
-                folder,
-                filename
-                or f"{self.fits_filename.split('-')[0]}_{self.name}.{extension}",
-            )
+            filepath = join(folder, filename or f"{self.get_image_name()}.{extension}")
             imsave(filepath, self.png_data)
             return filepath
+
+
+def get_filter_from_filename(fits_filename: str) -> WebbFilter:
+    """
+    Gets filter by searching for an instance of a filter name in fits
+    filename. If there are multiple instances, prefers the one that is on
+    the pupil wheel, or appears last.
+
+    If no instance of a filter name is found, returns `None`.
+    """
+
+    # Get instrument and filter names from fits filename
+    try:
+        name_parts = fits_filename.split("_")
+        instrument = name_parts[2]
+        filters = name_parts[3].split("-")
+    except:
+        return None
+
+    # Get dictionary of filters for the specific instrument
+    if instrument not in WebbFilters.FILTERS:
+        return None
+    instrument_filters = WebbFilters.FILTERS[instrument].dict
+
+    # Find appropriate filter
+    fits_filter = None
+    for filter in reversed(filters):
+        if filter in instrument_filters and (
+            fits_filter is None or instrument_filters[filter].is_pupil
+        ):
+            fits_filter = instrument_filters[filter]
+
+    return fits_filter
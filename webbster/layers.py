@@ -6,6 +6,7 @@ from PIL import Image
 from skimage import color
 from skimage.io import imread
 
+from .cache import LayerCache
 from .fits import WebbsterFITS
 from .jwst_metadata import WebbFilters, WebbFilter
 
@@ -25,13 +26,15 @@ class WebbsterLayer:
         saturation: float = None,
         value: float = None,
         filter: WebbFilter = None,
+        cache: LayerCache = None,
     ) -> "WebbsterLayer":
         """Creates WebbsterLayer from an image file.
 
         If `filter` is provided, gets the colors for that filter. Otherwise,
         attempts to extract the filter name from the filename. Then, if `hue`
         and/or `saturation` are provided, uses those values instead. The `value`
-        defaults to 1 unless otherwise specified."""
+        defaults to 1 unless otherwise specified. If `cache` is provided, the
+        image data is loaded through it instead of decoding the image."""
 
         # If no filter is provided, looks for the filter name in the filename in
         # the format "*_INSTRUMENT-FILTER.ext". If the name was auto generated
@@ -57,8 +60,9 @@ class WebbsterLayer:
         hue, saturation, value = WebbsterLayer.get_hsv(
             hue, saturation, value, filter, strict=True
         )
+        image = cache.load(image_file) if cache else imread(image_file)
         return WebbsterLayer(
-            imread(image_file), basename(image_file), hue, saturation, value, image_file
+            image, basename(image_file), hue, saturation, value, image_file
         )
 
     def fromFITS(
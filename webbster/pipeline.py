@@ -0,0 +1,288 @@
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from os.path import join
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from skimage.io import imsave
+
+from .fits import WebbsterFITS
+from .layers import WebbsterLayer, screen_blend_multiple
+
+
+class WebbsterPipeline:
+    """Keeps a set of aligned grayscale layers in memory so that they can be
+    recolored and blended repeatedly, only writing files when asked."""
+
+    def fromFITS(
+        fits_filepaths: List[str],
+        coadd: bool = False,
+        coadd_method: str = "mean",
+        verbose: bool = False,
+    ) -> "WebbsterPipeline":
+        """Creates WebbsterPipeline from a list of FITS files.
+
+        Each file is loaded, has its contrast adjusted, and is aligned with the
+        file with the greatest resolution. If `coadd` is `True`, files with the
+        same filter are first combined into a single layer using `coadd_method`
+        (see `WebbsterFITS.coadd()`). Otherwise, layers with duplicate filter
+        names are renamed. If `verbose` is `True`, prints progress messages."""
+
+        def log(message: str):
+            if verbose:
+                print(message)
+
+        log(f"Loading images from fits.")
+        filters = [WebbsterFITS(filepath) for filepath in fits_filepaths]
+
+        # Find image with greatest resolution to use as reference for aligning
+        # other images.
+        max_res = 0
+        ref_filter = filters[0]
+        for filter in filters:
+            log(f" > Checking resolution of {filter.name}.")
+            if filter.res > max_res:
+                max_res = filter.res
+                ref_filter = filter
+
+        # If co-adding, combine each group of images with the same filter into a
+        # single image aligned with the reference. Images without a recognized
+        # filter have nothing in common, so they are never combined.
+        if coadd:
+            groups = {}
+            for filter in filters:
+                key = filter.name if filter.filter else id(filter)
+                groups.setdefault(key, []).append(filter)
+            filters = []
+            for group in groups.values():
+                if len(group) > 1:
+                    log(f" > Co-adding {len(group)} images of {group[0].name}.")
+                    group[0].coadd(group[1:], ref_filter, coadd_method)
+                    if ref_filter in group:
+                        ref_filter = group[0]
+                filters.append(group[0])
+
+        # Rename filters if there are duplicate filter names
+        names = {}
+        for filter in filters:
+            if filter.name in names:
+                names[filter.name] += 1
+                filter.name = filter.name + "-" + str(names[filter.name])
+            else:
+                names[filter.name] = 1
+
+        log(f" > Reference filter is {ref_filter.name}.")
+
+        # Process each layer
+        layers = []
+        image_names = []
+        for filter in filters:
+            log(f"Processing {filter.name}.")
+            log(f" > Adjusting contrast of {filter.name}.")
+            filter.adjust_contrast()
+            # Co-added images already share the header of the reference
+            if filter.hdu is not ref_filter.hdu:
+                log(f" > Reprojecting {filter.name}.")
+                filter.reproject(ref_filter)
+            # Converts data to uint8 without saving
+            filter.save_image()
+            layers.append(WebbsterLayer.fromFITS(filter))
+            image_names.append(filter.get_image_name())
+
+        return WebbsterPipeline(layers, image_names)
+
+    def fromSharedMemory(descriptors: List[Dict[str, Any]]) -> "WebbsterPipeline":
+        """Creates WebbsterPipeline from layers that another pipeline has placed
+        in shared memory, using the descriptors returned by its `share()`.
+
+        The grayscale images are not copied, so they must not be modified."""
+
+        layers = []
+        image_names = []
+        handles = []
+        for descriptor in descriptors:
+            shm = attach_shared_memory(descriptor["shm_name"])
+            gray_image = np.ndarray(
+                descriptor["shape"], dtype=descriptor["dtype"], buffer=shm.buf
+            )
+            layers.append(
+                WebbsterLayer(
+                    gray_image,
+                    descriptor["name"],
+                    descriptor["hue"],
+                    descriptor["saturation"],
+                    descriptor["value"],
+                )
+            )
+            image_names.append(descriptor["image_name"])
+            handles.append(shm)
+
+        pipeline = WebbsterPipeline(layers, image_names)
+        pipeline.shared_memory = handles
+        return pipeline
+
+    def __init__(self, layers: List[WebbsterLayer], image_names: List[str] = None):
+        """Creates WebbsterPipeline from the given layers, which must already be
+        aligned. `image_names` are the names (without extension) used when
+        saving each layer, which default to the names of the layers."""
+
+        self.layers = layers
+        self.image_names = image_names or [layer.name for layer in layers]
+        self.shared_memory = []
+        self.owns_shared_memory = False
+
+    def get_layer(self, name: str) -> WebbsterLayer:
+        """Returns the layer with the given name."""
+
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        raise KeyError(f'No layer named "{name}".')
+
+    def set_color(
+        self,
+        name: str,
+        hue: float = None,
+        saturation: float = None,
+        value: float = None,
+    ):
+        """
+        Changes the color of the layer with the given name. Any of `hue`,
+        `saturation`, and `value` that are not provided are left unchanged.
+        """
+
+        layer = self.get_layer(name)
+        hsv = (
+            layer.hue if hue is None else hue,
+            layer.saturation if saturation is None else saturation,
+            layer.value if value is None else value,
+        )
+        if hsv != (layer.hue, layer.saturation, layer.value):
+            layer.hue, layer.saturation, layer.value = hsv
+            # Colorized image is now out of date
+            if hasattr(layer, "color_image"):
+                del layer.color_image
+
+    def set_colors(self, colors: Dict[str, Tuple[float, float, float]]):
+        """Changes the colors of multiple layers, using a dictionary with layer
+        names as keys and HSV tuples as values."""
+
+        for name, hsv in colors.items():
+            self.set_color(name, *hsv)
+
+    def blend(self, brightness: float = None) -> Any:
+        """
+        Blends the layers into a single RGB image and returns it, only
+        colorizing the layers that have changed since the last time. See
+        `screen_blend_multiple()` for `brightness`.
+        """
+
+        for layer in self.layers:
+            if not hasattr(layer, "color_image"):
+                layer.colorize()
+        return screen_blend_multiple(
+            [layer.color_image for layer in self.layers], brightness
+        )
+
+    def save(self, filepath: str, brightness: float = None) -> str:
+        """Blends the layers and saves the result to `filepath`, which is
+        returned."""
+
+        imsave(filepath, self.blend(brightness))
+        return filepath
+
+    def save_layers(self, folder: str, extension: str = "png") -> List[str]:
+        """
+        Saves the grayscale image of each layer to `folder`, using the same
+        names as `WebbsterFITS.save_image()` and `extension` as the file
+        extension. Returns the filepaths of the saved images.
+        """
+
+        filepaths = []
+        for layer, image_name in zip(self.layers, self.image_names):
+            layer.filepath = join(folder, f"{image_name}.{extension}")
+            imsave(layer.filepath, layer.gray_image)
+            filepaths.append(layer.filepath)
+        return filepaths
+
+    def share(self) -> List[Dict[str, Any]]:
+        """
+        Moves the grayscale image of each layer into shared memory, so that
+        other processes can use the layers through `fromSharedMemory()` without
+        copying or saving them. Returns a list of picklable descriptors (one for
+        each layer) to pass to the other processes.
+
+        The shared memory is freed when `close()` is called on this pipeline.
+        """
+
+        if not self.shared_memory:
+            for layer in self.layers:
+                shm = shared_memory.SharedMemory(
+                    create=True, size=layer.gray_image.nbytes
+                )
+                shared_image = np.ndarray(
+                    layer.gray_image.shape, dtype=layer.gray_image.dtype, buffer=shm.buf
+                )
+                shared_image[:] = layer.gray_image
+                layer.gray_image = shared_image
+                self.shared_memory.append(shm)
+            self.owns_shared_memory = True
+
+        return [
+            {
+                "shm_name": shm.name,
+                "shape": layer.gray_image.shape,
+                "dtype": layer.gray_image.dtype.str,
+                "name": layer.name,
+                "image_name": image_name,
+                "hue": layer.hue,
+                "saturation": layer.saturation,
+                "value": layer.value,
+            }
+            for layer, image_name, shm in zip(
+                self.layers, self.image_names, self.shared_memory
+            )
+        ]
+
+    def close(self):
+        """
+        Releases any shared memory used by the layers, freeing it if it was
+        created by this pipeline. The grayscale images of the layers can no
+        longer be used afterwards.
+        """
+
+        if not self.shared_memory:
+            return
+        # The arrays must be released before their buffers can be closed
+        for layer in self.layers:
+            del layer.gray_image
+        for shm in self.shared_memory:
+            shm.close()
+            if self.owns_shared_memory:
+                # A process that attached using the same resource tracker (e.g.
+                # a multiprocessing child) may have unregistered this block, so
+                # register it again (which does nothing if it still is) so that
+                # unlinking doesn't make the tracker complain
+                if sys.version_info < (3, 13):
+                    resource_tracker.register(shm._name, "shared_memory")
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+        self.shared_memory = []
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to the existing shared memory block `name` without tracking it.
+
+    Otherwise, the resource tracker of the attaching process would unlink the
+    block when that process exits, even though it is still used by the pipeline
+    that created it (which frees it in `close()`).
+    """
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm